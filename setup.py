@@ -38,7 +38,6 @@ install_requires = [
     "pyyaml<=6.0.1",
     "dockertown<=0.2.3",
     "requests<=2.31.0",
-    "dataclass-wizard<=0.22.2",
     "requirements-parser<=0.5.0"
 ]
 tests_require = [
@@ -1,9 +1,8 @@
-import yaml
+from .utils.misc import load_yaml_file
 
 
 def parse_configurations(config_file: str) -> dict:
-    with open(config_file, "rt") as fin:
-        configurations_content = yaml.load(fin, Loader=yaml.SafeLoader)
+    configurations_content = load_yaml_file(config_file)
     if "version" not in configurations_content:
         raise ValueError("The configurations file must have a root key 'version'.")
     if configurations_content["version"] == "1.0":
@@ -1,4 +1,4 @@
-from typing import Dict, Callable, Tuple
+from typing import Dict, Callable, Tuple, FrozenSet
 
 ProjectName = str
 ProjectType = str
@@ -22,6 +22,18 @@ REQUIRED_METADATA_PER_TYPE_KEYS = {
     },
 }
 
+# full set of required keys per version, and per (version, type) where the type requires more keys
+REQUIRED_METADATA_KEYS_BY_VERSION: Dict[ProjectTypeVersion, FrozenSet[str]] = {
+    version: frozenset(REQUIRED_METADATA_KEYS["*"]) | frozenset(keys)
+    for version, keys in REQUIRED_METADATA_KEYS.items() if version != "*"
+}
+
+REQUIRED_METADATA_KEYS_BY_VERSION_TYPE: Dict[Tuple[ProjectTypeVersion, ProjectType], FrozenSet[str]] = {
+    (version, ptype): REQUIRED_METADATA_KEYS_BY_VERSION[version] | frozenset(keys)
+    for ptype, per_version in REQUIRED_METADATA_PER_TYPE_KEYS.items()
+    for version, keys in per_version.items()
+}
+
 CANONICAL_ARCH = {
     "arm": "arm32v7",
     "arm32v7": "arm32v7",
@@ -46,6 +58,10 @@ BUILD_COMPATIBILITY_MAP = {"arm32v7": ["arm32v7"], "arm64v8": ["arm32v7", "arm64
 
 DOCKER_LABEL_DOMAIN = "org.duckietown.label"
 
+# batches of at least this many files are read on a thread pool
+CONCURRENT_READS_THRESHOLD = 8
+CONCURRENT_READS_MAX_WORKERS = 8
+
 ARCH_TO_PLATFORM = {"arm32v7": "linux/arm/v7", "arm64v8": "linux/arm64", "amd64": "linux/amd64"}
 
 ARCH_TO_PLATFORM_OS = {"arm32v7": "linux", "arm64v8": "linux", "amd64": "linux"}
@@ -218,3 +234,6 @@ TEMPLATE_TO_DOCS: Dict[ProjectType,
 
 DCSS_DOCKER_IMAGE_METADATA = "https://duckietown-public-storage.s3.amazonaws.com/docker/image/{registry}/" \
                              "{organization}/{repository}/{tag}/latest.json"
+
+# (connect, read) timeouts in seconds for HTTP requests
+HTTP_TIMEOUT = (3.05, 10)
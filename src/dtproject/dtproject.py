@@ -1,24 +1,33 @@
 import copy
 import dataclasses
-import glob
 import os
+import re
+import sys
 import traceback
 from abc import abstractmethod
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from subprocess import CalledProcessError
-from types import SimpleNamespace
-from typing import Optional, List, Union, Set, cast, Any
+from typing import Optional, List, Union, Set, FrozenSet, Tuple, Iterator, cast, Any
 
 import requests
-import yaml
 from requests import Response
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from dockertown import Image
 
 from dockertown.exceptions import NoSuchImage
 
+# orjson parses (large) image metadata documents faster than the standard library
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 from .configurations import parse_configurations
 from .exceptions import \
+    DTProjectError, \
     RecipeProjectNotFound, \
     DTProjectNotFound, \
     MalformedDTProject, \
@@ -28,19 +37,134 @@ from .exceptions import \
 
 from .constants import *
 from .types import LayerSelf, LayerTemplate, LayerDistro, LayerBase, LayerRecipes, LayerOptions, Recipe, \
-    Layer, LayerFormat, LayerContainers, LayerDevContainers
+    Layer, LayerFormat, LayerContainers, LayerDevContainers, DATACLASS_SLOTS
+from .utils.cache import cached
 from .utils.docker import docker_client
-from .utils.misc import run_cmd, git_remote_url_to_https, assert_canonical_arch, DEPRECATED, \
-    load_dependencies_file, safe_name
+from .utils.misc import run_cmds, git_remote_url_to_https, assert_canonical_arch, DEPRECATED, \
+    load_dependencies_file, safe_name, load_yaml_file, cached_property
 from .recipe import get_recipe_project_dir, update_recipe, clone_recipe
 
+# a shared session reuses connections (and TLS handshakes) across requests to the same host
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.3),
+))
+
+
+# a (non-blank) line of a '.dtproject' file is either a comment, a KEY=VALUE pair, or malformed
+_DTPROJECT_LINE = re.compile(
+    rb"^[ \t]*(?:#.*|(?P<key>[^=\r\n]*?)[ \t]*=[ \t]*(?P<value>.*?)|(?P<malformed>[^ \t\r\n].*?))[ \t\r]*$",
+    re.M
+)
+
+# (layer name, file path, mtime in ns, size)
+LayerFileStat = Tuple[str, str, int, int]
+
+
+@lru_cache(maxsize=512)
+def _parse_yaml_cached(fpath: str, mtime_ns: int, size: int) -> Any:
+    # in-memory cache in front of the on-disk one, the file stats in the key take care of invalidation
+    return cached(("layer", fpath, mtime_ns, size), lambda: load_yaml_file(fpath))
+
+
+@lru_cache(maxsize=128)
+def _load_layers_content_cached(layer_stats: Tuple[LayerFileStat, ...]) -> Dict[str, Any]:
+    # a single (on disk) cache entry covers the whole set of (unchanged) layer files
+    return cached(("layers",) + layer_stats, lambda: _load_layers_content(layer_stats))
+
+
+def _map_files(fcn: Callable[[Any], Any], files: List[Any]) -> List[Any]:
+    # reading a handful of small files is faster than spinning up a thread pool
+    if len(files) < CONCURRENT_READS_THRESHOLD:
+        return [fcn(f) for f in files]
+    # files are independent of each other, read them concurrently
+    with ThreadPoolExecutor(max_workers=CONCURRENT_READS_MAX_WORKERS) as pool:
+        return list(pool.map(fcn, files))
+
+
+def _has_shebang(fpath: str) -> bool:
+    with open(fpath, "rb") as fin:
+        return fin.read(2) == b"#!"
+
+
+def _load_layers_content(layer_stats: Tuple[LayerFileStat, ...]) -> Dict[str, Any]:
+    contents: List[Any] = _map_files(lambda stat: _parse_yaml_cached(*stat[1:]), list(layer_stats))
+    return {stat[0]: content for stat, content in zip(layer_stats, contents)}
+
+
+@lru_cache(maxsize=64)
+def _make_layers_cls(layer_names: FrozenSet[str]) -> type:
+    # projects sharing the same set of custom layers share the same (generated) class
+    return dataclasses.make_dataclass(
+        'ExtendedLayers',
+        fields=[
+            (layer, dict, cast(dataclasses.Field, dataclasses.field(default_factory=dict)))
+            for layer in sorted(layer_names)
+        ],
+        bases=(DTProject.Layers,),
+        # layers are read-only, extended classes must be frozen (and slotted) like their base
+        frozen=True,
+        **DATACLASS_SLOTS
+    )
+
+
+@dataclasses.dataclass(frozen=True, **DATACLASS_SLOTS)
+class _RepoInfo:
+    name: Optional[str]
+    sha: str
+    detached: bool
+    branch: str
+    head_version: str
+    closest_version: str
+    repository_url: str
+    repository_page: Optional[str]
+    index_nmodified: int
+    index_nadded: int
+
+
+@dataclasses.dataclass(frozen=True, **DATACLASS_SLOTS)
+class _RepoStatus:
+    head_version: str
+    closest_version: str
+    version_name: str
+    is_clean: bool
+    is_release: bool
+    is_detached: bool
+
+
+def _stem(p: str) -> str:
+    """
+    Same as `Path(p).stem` without the overhead of building a Path object.
+    """
+    name: str = os.path.basename(p.rstrip("/"))
+    i: int = name.rfind(".")
+    return name[:i] if 0 < i < len(name) - 1 else name
+
+
+def _scan_pattern_dirs(base_dir: str, prefix: str) -> Iterator[str]:
+    """
+    Equivalent to resolving the pattern `<base_dir>/<prefix>*` and keeping only directories,
+    but with a single directory listing instead of one stat per match.
+    """
+    if not os.path.isdir(base_dir):
+        return
+    with os.scandir(base_dir) as entries:
+        for entry in entries:
+            # like glob, hidden entries only match patterns that explicitly start with a dot
+            if entry.name.startswith(".") and not prefix.startswith("."):
+                continue
+            if entry.name.startswith(prefix) and entry.is_dir():
+                yield entry.path
+
 
 class DTProject:
     """
     Class representing a DTProject on disk.
     """
 
-    @dataclasses.dataclass
+    @dataclasses.dataclass(frozen=True, **DATACLASS_SLOTS)
     class Layers:
         format: LayerFormat
         self: LayerSelf
@@ -66,32 +190,19 @@ class DTProject:
     KNOWN_LAYERS = {**REQUIRED_LAYERS, **OPTIONAL_LAYERS}
 
     def __init__(self, path: str, recipe: Optional[str] = None):
-        self._adapters = []
-        self._repository = None
-        # use `fs` adapter by default
         self._path = os.path.abspath(path)
-        self._adapters.append("fs")
         # recipe info
         self._custom_recipe_dir: Optional[str] = None
         self._recipe_version: Optional[str] = None
-        # use `git` adapter if available
-        if os.path.isdir(os.path.join(self._path, ".git")):
-            repo_info = self._get_repo_info(self._path)
-            self._repository = SimpleNamespace(
-                name=repo_info["REPOSITORY"],
-                sha=repo_info["SHA"],
-                detached=repo_info["BRANCH"] == "HEAD",
-                branch=repo_info["BRANCH"],
-                head_version=repo_info["VERSION.HEAD"],
-                closest_version=repo_info["VERSION.CLOSEST"],
-                repository_url=repo_info["ORIGIN.URL"],
-                repository_page=repo_info["ORIGIN.HTTPS.URL"],
-                index_nmodified=repo_info["INDEX_NUM_MODIFIED"],
-                index_nadded=repo_info["INDEX_NUM_ADDED"],
-            )
-            self._adapters.append("git")
         # at this point we initialize the proper subclass
-        for DTProjectSubClass in [DTProjectV1, DTProjectV2, DTProjectV3, DTProjectV4]:
+        # - v4 projects only need a 'dtproject' directory, this is the cheapest check so we do it first
+        if DTProjectV4.is_instance_of(path):
+            self.__class__ = DTProjectV4
+            # noinspection PyTypeChecker
+            DTProjectV4.__init__(self, path, recipe=recipe)
+            return
+        # - v1 to v3 projects need their '.dtproject' file parsed
+        for DTProjectSubClass in [DTProjectV1, DTProjectV2, DTProjectV3]:
             if DTProjectSubClass.is_instance_of(path):
                 self.__class__ = DTProjectSubClass
                 # noinspection PyTypeChecker
@@ -104,6 +215,51 @@ class DTProject:
     def path(self) -> str:
         return self._path
 
+    @property
+    def _has_git(self) -> bool:
+        return os.path.isdir(os.path.join(self._path, ".git"))
+
+    @cached_property
+    def _repository(self) -> Optional[_RepoInfo]:
+        # use `git` adapter if available
+        if not self._has_git:
+            return None
+        repo_info = self._get_repo_info(self._path)
+        return _RepoInfo(
+            name=repo_info["REPOSITORY"],
+            sha=repo_info["SHA"],
+            detached=repo_info["BRANCH"] == "HEAD",
+            branch=repo_info["BRANCH"],
+            head_version=repo_info["VERSION.HEAD"],
+            closest_version=repo_info["VERSION.CLOSEST"],
+            repository_url=repo_info["ORIGIN.URL"],
+            repository_page=repo_info["ORIGIN.HTTPS.URL"],
+            index_nmodified=repo_info["INDEX_NUM_MODIFIED"],
+            index_nadded=repo_info["INDEX_NUM_ADDED"],
+        )
+
+    @cached_property
+    def _repo_status(self) -> _RepoStatus:
+        repo: Optional[_RepoInfo] = self._repository
+        if repo is None:
+            return _RepoStatus(
+                head_version="latest",
+                closest_version="latest",
+                version_name="latest",
+                is_clean=True,
+                is_release=False,
+                is_detached=False,
+            )
+        is_clean: bool = (repo.index_nmodified + repo.index_nadded) == 0
+        return _RepoStatus(
+            head_version=repo.head_version,
+            closest_version=repo.closest_version,
+            version_name=repo.branch if repo.branch != "HEAD" else repo.head_version,
+            is_clean=is_clean,
+            is_release=is_clean and repo.head_version != "ND",
+            is_detached=repo.detached,
+        )
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -209,32 +365,31 @@ class DTProject:
     def build_args(self) -> Dict[str, Any]:
         return {}
 
-    @property
+    @cached_property
     def needs_recipe(self) -> bool:
         return self.options.needs_recipe
 
     @property
     def head_version(self):
-        return self._repository.head_version if self._repository else "latest"
+        return self._repo_status.head_version
 
-    @property
+    @cached_property
     def safe_head_version(self) -> str:
         return safe_name(self.head_version)
 
     @property
     def closest_version(self):
-        return self._repository.closest_version if self._repository else "latest"
+        return self._repo_status.closest_version
 
-    @property
+    @cached_property
     def safe_closest_version(self) -> str:
         return safe_name(self.closest_version)
 
     @property
     def version_name(self):
-        return (self._repository.branch if self._repository.branch != "HEAD" else self.head_version) \
-            if self._repository else "latest"
+        return self._repo_status.version_name
 
-    @property
+    @cached_property
     def safe_version_name(self) -> str:
         return safe_name(self.version_name)
 
@@ -247,8 +402,9 @@ class DTProject:
         return self._repository.sha if self._repository else "ND"
 
     @property
-    def adapters(self):
-        return copy.copy(self._adapters)
+    def adapters(self) -> List[str]:
+        # `fs` and `dtproject` adapters are always used, `git` only if the project is a repository
+        return ["fs", "git", "dtproject"] if self._has_git else ["fs", "dtproject"]
 
     @property
     @abstractmethod
@@ -270,7 +426,7 @@ class DTProject:
             else get_recipe_project_dir(self.recipe_info)
         )
 
-    @property
+    @cached_property
     def recipe(self) -> Optional["DTProject"]:
         # load recipe project
         return DTProject(self.recipe_dir) if self.needs_recipe else None
@@ -327,30 +483,40 @@ class DTProject:
         if self.needs_recipe:
             paths.append(self.recipe.path)
         # find launchers
-        launchers = []
+        launchers: List[str] = []
+        seen: Set[str] = set()
         for root in paths:
             launchers_dir = os.path.join(root, "launchers")
             if not os.path.exists(launchers_dir):
                 continue
-            files = [
-                os.path.join(launchers_dir, f)
-                for f in os.listdir(launchers_dir)
-                if os.path.isfile(os.path.join(launchers_dir, f))
-            ]
-
-            def _has_shebang(f):
-                with open(f, "rt") as fin:
-                    return fin.readline().startswith("#!")
-
-            launchers = [Path(f).stem for f in files if os.access(f, os.X_OK) or _has_shebang(f)]
+            with os.scandir(launchers_dir) as entries:
+                files: List[Tuple[str, str, bool]] = [
+                    (entry.name, entry.path, bool(entry.stat().st_mode & 0o111))
+                    for entry in entries if entry.is_file()
+                ]
+            # executable files are launchers, so are files with a shebang
+            to_probe: List[str] = [fpath for _, fpath, executable in files if not executable]
+            shebangs: Dict[str, bool] = dict(zip(to_probe, _map_files(_has_shebang, to_probe)))
+            for name, fpath, executable in files:
+                if not (executable or shebangs[fpath]):
+                    continue
+                # the same launcher can be shipped by both the project and its recipe
+                launcher: str = _stem(name)
+                if launcher not in seen:
+                    seen.add(launcher)
+                    launchers.append(launcher)
         # ---
         return launchers
 
     def set_recipe_dir(self, path: str):
         self._custom_recipe_dir = path
+        # the recipe project (if already loaded) is now stale
+        self.__dict__.pop("recipe", None)
 
     def set_recipe_version(self, branch: str):
         self._recipe_version = branch
+        # the recipe project (if already loaded) is now stale
+        self.__dict__.pop("recipe", None)
 
     def ensure_recipe_exists(self):
         if not self.needs_recipe:
@@ -360,6 +526,8 @@ class DTProject:
             cloned: bool = clone_recipe(self.recipe_info)
             if not cloned:
                 raise RecipeProjectNotFound(f"Recipe repository could not be downloaded.")
+            # the recipe project (if already loaded) is now stale
+            self.__dict__.pop("recipe", None)
         # make sure the recipe exists
         if not os.path.exists(self.recipe_dir):
             raise RecipeProjectNotFound(f"Recipe not found at '{self.recipe_dir}'")
@@ -370,26 +538,24 @@ class DTProject:
     def update_cached_recipe(self) -> bool:
         """Update recipe if not using custom given recipe"""
         if self.needs_recipe and not self._custom_recipe_dir:
-            return update_recipe(self.recipe_info)  # raises: UserError if the recipe has not been cloned
+            updated: bool = update_recipe(self.recipe_info)  # raises: UserError if the recipe has not been cloned
+            if updated:
+                # the recipe project (if already loaded) is now stale
+                self.__dict__.pop("recipe", None)
+            return updated
         return False
 
     def is_release(self):
-        if not self.is_clean():
-            return False
-        if self._repository and self.head_version != "ND":
-            return True
-        return False
+        return self._repo_status.is_release
 
     def is_clean(self):
-        if self._repository:
-            return (self._repository.index_nmodified + self._repository.index_nadded) == 0
-        return True
+        return self._repo_status.is_clean
 
     def is_dirty(self):
         return not self.is_clean()
 
     def is_detached(self):
-        return self._repository.detached if self._repository else False
+        return self._repo_status.is_detached
 
     def image(
             self,
@@ -401,6 +567,20 @@ class DTProject:
             loop: bool = False,
             docs: bool = False,
             extra: Optional[str] = None,
+    ) -> str:
+        return self._compose_image(registry, owner, self.name, version, extra, loop, docs, arch)
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _compose_image(
+            registry: str,
+            owner: str,
+            name: str,
+            version: str,
+            extra: Optional[str],
+            loop: bool,
+            docs: bool,
+            arch: Optional[str],
     ) -> str:
         if arch is not None:
             assert_canonical_arch(arch)
@@ -408,7 +588,7 @@ class DTProject:
         docs: str = "-docs" if docs else ""
         extra: str = f"-{extra}" if extra else ""
         arch: str = f"-{arch}" if arch else ""
-        return f"{registry}/{owner}/{self.name}:{version}{extra}{loop}{docs}{arch}"
+        return f"{registry}/{owner}/{name}:{version}{extra}{loop}{docs}{arch}"
 
     def image_vscode(
             self,
@@ -501,12 +681,24 @@ class DTProject:
                 registry=registry,
                 owner=owner,
                 version=version,
+                metadata=image,
             ),
         }
         # ---
         return meta
 
     def configurations(self) -> dict:
+        # the parsed configurations are cached, callers get their own copy
+        return copy.deepcopy(self._configurations)
+
+    def configuration(self, name: str) -> dict:
+        configurations = self._configurations
+        if name not in configurations:
+            raise KeyError(f"Configuration with name '{name}' not found.")
+        return copy.deepcopy(configurations[name])
+
+    @cached_property
+    def _configurations(self) -> dict:
         if int(self.type_version) < 2:
             raise NotImplementedError(
                 "Project configurations were introduced with template "
@@ -521,12 +713,6 @@ class DTProject:
         # ---
         return configurations
 
-    def configuration(self, name: str) -> dict:
-        configurations = self.configurations()
-        if name not in configurations:
-            raise KeyError(f"Configuration with name '{name}' not found.")
-        return configurations[name]
-
     def code_paths(self, root: Optional[str] = None) -> Tuple[List[str], List[str]]:
         # make sure we support this project version
         if self.type not in TEMPLATE_TO_SRC or self.type_version not in TEMPLATE_TO_SRC[self.type]:
@@ -548,14 +734,12 @@ class DTProject:
         if local.endswith("*"):
             # resolve 'local' with respect to the project path
             local_abs: str = os.path.join(self.path, local)
-            # resolve pattern
-            locals = glob.glob(local_abs)
-            # we only support mounting directories
-            locals = [loc for loc in locals if os.path.isdir(loc)]
+            # resolve pattern (we only support mounting directories)
+            locals = list(_scan_pattern_dirs(os.path.dirname(local_abs), os.path.basename(local_abs)[:-1]))
             # replace 'self.path' prefix with 'root'
             locals = [os.path.join(root, os.path.relpath(loc, self.path)) for loc in locals]
             # destinations take the stem of the source
-            destinations = [os.path.join(destination, Path(loc).stem) for loc in locals]
+            destinations = [os.path.join(destination, _stem(loc)) for loc in locals]
         else:
             # by default, there is only one local and one destination
             locals: List[str] = [os.path.join(root, local)]
@@ -603,14 +787,12 @@ class DTProject:
         if local.endswith("*"):
             # resolve 'local' with respect to the project path
             local_abs: str = os.path.join(self.path, local)
-            # resolve pattern
-            locals = glob.glob(local_abs)
-            # we only support mounting directories
-            locals = [loc for loc in locals if os.path.isdir(loc)]
+            # resolve pattern (we only support mounting directories)
+            locals = list(_scan_pattern_dirs(os.path.dirname(local_abs), os.path.basename(local_abs)[:-1]))
             # replace 'self.path' prefix with 'root'
             locals = [os.path.join(root, os.path.relpath(loc, self.path)) for loc in locals]
             # destinations take the stem of the source
-            destinations = [os.path.join(destination, Path(loc).stem) for loc in locals]
+            destinations = [os.path.join(destination, _stem(loc)) for loc in locals]
         else:
             # by default, there is only one local and one destination
             locals: List[str] = [os.path.join(root, local)]
@@ -700,10 +882,13 @@ class DTProject:
         # ---
         return metadata
 
-    def image_labels(self, endpoint, *, arch: str, owner: str, registry: str, version: str):
-        metadata: dict = self.image_metadata(
-            endpoint, arch=arch, owner=owner, registry=registry, version=version
-        )
+    def image_labels(self, endpoint, *, arch: str, owner: str, registry: str, version: str,
+                     metadata: Optional[dict] = None):
+        # reuse the given image metadata (if any) to avoid inspecting the image again
+        if metadata is None:
+            metadata = self.image_metadata(
+                endpoint, arch=arch, owner=owner, registry=registry, version=version
+            )
         return metadata["config"]["labels"]
 
     def remote_image_metadata(self, arch: str, owner: str, registry: str) -> Dict:
@@ -717,13 +902,11 @@ class DTProject:
             tag=tag
         )
         # fetch json
-        response: Response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()
-        elif response.status_code == 404:
+        response: Response = _HTTP.get(url, timeout=HTTP_TIMEOUT, stream=False)
+        if response.status_code == 404:
             raise NotFound(f"Remote image '{registry}/{owner}/{self.name}:{tag}' not found")
-        else:
-            response.raise_for_status()
+        response.raise_for_status()
+        return _json_loads(response.content)
 
     def apt_dependencies(self, comments: bool = False) -> List[str]:
         dependencies_fpath: str = os.path.join(self.path, "dependencies-apt.txt")
@@ -739,76 +922,30 @@ class DTProject:
 
     @staticmethod
     def _get_repo_info(path):
-        # get current SHA
-        try:
-            # TODO: this command can return the following error (which is for now just printed to screen)
-            #      .
-            #      .
-            #         fatal: ambiguous argument 'HEAD': unknown revision or path not in the working tree.
-            #         Use '--' to separate paths from revisions, like this:
-            #         'git <command> [<revision>...] -- [<file>...]'
-            #      .
-            #      .
-            #   This happens when the repository has no commits yet, so no HEAD.
-            #   We need to catch it and gracefully handle the case, warn the user that there are no commits
-            #   and revert to non-repository behavior.
-            #
-            sha = run_cmd(["git", "-C", f'"{path}"', "rev-parse", "HEAD"])[0]
-        except CalledProcessError as e:
-            if e.returncode == 128:
-                # no commits yet
-                sha = "ND"
-            else:
-                raise e
-        # get branch name
-        branch = run_cmd(["git", "-C", f'"{path}"', "branch", "--show-current"])[0]
-        # head tag
+        info: Optional[tuple] = None
+        # read the repository in-process if libgit2 is available
+        #   NOTE: pygit2 is slow to import, only projects with a git repository pay for it
         try:
-            head_tag = run_cmd(
-                [
-                    "git",
-                    "-C",
-                    f'"{path}"',
-                    "describe",
-                    "--exact-match",
-                    "--tags",
-                    "HEAD",
-                    "2>/dev/null",
-                    "||",
-                    ":",
-                ]
-            )
-        except CalledProcessError as e:
-            if sha == "ND":
-                # there is no HEAD
-                head_tag = None
-            else:
-                raise e
-        head_tag = head_tag[0] if head_tag else "ND"
-        closest_tag = run_cmd(["git", "-C", f'"{path}"', "tag"])
-        closest_tag = closest_tag[-1] if closest_tag else "ND"
+            import pygit2
+        except ImportError:
+            pygit2 = None
+        if pygit2 is not None:
+            try:
+                info = DTProject._read_repo_pygit2(path)
+            except (pygit2.GitError, KeyError):
+                # fall back to the git CLI
+                pass
+        if info is None:
+            info = DTProject._read_repo_cli(path)
+        sha, branch, head_tag, closest_tag, origin_url, nmodified, nadded = info
         repo = None
-        # get the origin url
-        try:
-            origin_url = run_cmd(["git", "-C", f'"{path}"', "config", "--get", "remote.origin.url"])[0]
+        # normalize the origin url
+        if origin_url:
             if origin_url.endswith(".git"):
                 origin_url = origin_url[:-4]
             if origin_url.endswith("/"):
                 origin_url = origin_url[:-1]
             repo = origin_url.split("/")[-1]
-        except CalledProcessError as e:
-            if e.returncode == 1:
-                origin_url = None
-            else:
-                raise e
-        # get info about current git INDEX
-        porcelain = ["git", "-C", f'"{path}"', "status", "--porcelain"]
-        modified = run_cmd(porcelain + ["--untracked-files=no"])
-        nmodified = len(modified)
-        added = run_cmd(porcelain)
-        # we are not counting files with .resolved extension
-        added = list(filter(lambda f: not f.endswith(".resolved"), added))
-        nadded = len(added)
         # return info
         return {
             "REPOSITORY": repo,
@@ -822,6 +959,121 @@ class DTProject:
             "INDEX_NUM_ADDED": nadded,
         }
 
+    @staticmethod
+    def _read_repo_pygit2(path) -> tuple:
+        import pygit2
+        repo = pygit2.Repository(path)
+        # get current SHA and branch name
+        if repo.head_is_unborn:
+            # the repository has no commits yet, so no HEAD
+            sha = "ND"
+            branch = repo.references["HEAD"].target
+        else:
+            sha = str(repo.head.target)
+            branch = "HEAD" if repo.head_is_detached else repo.head.name
+        if branch.startswith("refs/heads/"):
+            branch = branch[len("refs/heads/"):]
+        # head tag
+        head_tag = "ND"
+        if sha != "ND":
+            try:
+                head_tag = repo.describe(describe_strategy=pygit2.GIT_DESCRIBE_TAGS, max_candidates_tags=0)
+            except (KeyError, pygit2.GitError):
+                # no tags pointing at HEAD
+                pass
+        # `git tag` lists tags sorted by name
+        tags = sorted(ref[len("refs/tags/"):] for ref in repo.references if ref.startswith("refs/tags/"))
+        closest_tag = tags[-1] if tags else "ND"
+        # get the origin url
+        try:
+            origin_url = repo.config["remote.origin.url"]
+        except KeyError:
+            origin_url = None
+        # get info about current git INDEX
+        #   NOTE: older pygit2 releases report ignored files as well, `git status` never does
+        #   NOTE: GIT_STATUS_CURRENT is 0, masking out ignored files leaves only real changes
+        try:
+            # like `git status`, report an untracked directory as a single entry
+            raw_status = repo.status(untracked_files="normal")
+        except TypeError:
+            # older pygit2 releases always list every file in untracked directories
+            raw_status = repo.status()
+        status = {
+            f: flags & ~pygit2.GIT_STATUS_IGNORED
+            for f, flags in raw_status.items() if flags & ~pygit2.GIT_STATUS_IGNORED
+        }
+        # `git status` shows a staged rename as one entry, libgit2 as a deletion plus an addition
+        nrenamed = 0
+        if sha != "ND" and \
+                any(flags & pygit2.GIT_STATUS_INDEX_DELETED for flags in status.values()) and \
+                any(flags & pygit2.GIT_STATUS_INDEX_NEW for flags in status.values()):
+            diff = repo.index.diff_to_tree(repo.head.peel(pygit2.Tree))
+            diff.find_similar()
+            nrenamed = len([d for d in diff.deltas if d.status == pygit2.GIT_DELTA_RENAMED])
+        nmodified = len([f for f, flags in status.items() if not flags & pygit2.GIT_STATUS_WT_NEW]) - nrenamed
+        # we are not counting files with .resolved extension
+        nadded = len([f for f in status if not f.endswith(".resolved")]) - nrenamed
+        # ---
+        return sha, branch, head_tag, closest_tag, origin_url, nmodified, nadded
+
+    @staticmethod
+    def _read_repo_cli(path) -> tuple:
+        git = ["git", "-C", f'"{path}"']
+        porcelain = git + ["status", "--porcelain"]
+        # collect everything we need in a single shell invocation
+        cmds = [
+            # - current SHA
+            git + ["rev-parse", "--verify", "--quiet", "HEAD"],
+            # - branch name
+            git + ["branch", "--show-current"],
+            # - head tag
+            git + ["describe", "--exact-match", "--tags", "HEAD", "2>/dev/null"],
+            # - all tags
+            git + ["tag"],
+            # - origin url
+            git + ["config", "--get", "remote.origin.url"],
+            # - info about current git INDEX
+            porcelain + ["--untracked-files=no"],
+            porcelain,
+        ]
+        (
+            (sha_rc, sha),
+            (branch_rc, branch),
+            (_, head_tag),
+            (tags_rc, tags),
+            (origin_url_rc, origin_url),
+            (modified_rc, modified),
+            (added_rc, added),
+        ) = run_cmds(cmds)
+
+        def _check(rc: int, cmd: List[str], accept: Tuple[int, ...] = (0,)):
+            if rc not in accept:
+                raise CalledProcessError(rc, " ".join(cmd))
+
+        # get current SHA
+        #   NOTE: rev-parse fails (1 or 128) when the repository has no commits yet, so no HEAD
+        _check(sha_rc, cmds[0], accept=(0, 1, 128))
+        sha = sha[0] if sha_rc == 0 and sha else "ND"
+        # get branch name (empty when HEAD is detached)
+        _check(branch_rc, cmds[1])
+        branch = branch[0] if branch else "HEAD"
+        # head tag
+        head_tag = head_tag[0] if head_tag else "ND"
+        _check(tags_rc, cmds[3])
+        closest_tag = tags[-1] if tags else "ND"
+        # get the origin url (exit code 1 means that the key is not set)
+        _check(origin_url_rc, cmds[4], accept=(0, 1))
+        origin_url = origin_url[0] if origin_url_rc == 0 and origin_url else None
+        # get info about current git INDEX
+        _check(modified_rc, cmds[5])
+        nmodified = len(modified)
+        _check(added_rc, cmds[6])
+        # we are not counting files with .resolved extension
+        added = list(filter(lambda f: not f.endswith(".resolved"), added))
+        nadded = len(added)
+        # ---
+        return sha, branch, head_tag, closest_tag, origin_url, nmodified, nadded
+
     @classmethod
     @abstractmethod
     def is_instance_of(cls, path: str) -> bool:
@@ -835,10 +1087,7 @@ class DTProjectV4(DTProject):
 
     # noinspection PyMissingConstructor
     def __init__(self, path: str, recipe: Optional[str] = None):
-        # use `dtproject` adapter (required)
-        self._layers: DTProject.Layers = self._load_layers(path)
-        self._adapters.append("dtproject")
-        # consistency checks
+        # consistency checks (these load the layers)
         # - we need recipes but none are given
         if self.needs_recipe and self._layers.recipes.is_empty:
             raise InconsistentDTProject("The project is set to need a recipe (options.needs_recipe=True) but "
@@ -858,7 +1107,12 @@ class DTProjectV4(DTProject):
             raise ValueError(f"Recipe '{self._selected_recipe}' not defined in this project. Available "
                              f"recipes are: {list(self.recipes.keys())}")
 
-    @property
+    @cached_property
+    def _layers(self) -> 'DTProject.Layers':
+        # the 'dtproject' directory was already found by `is_instance_of`
+        return self._load_layers(self._path, validate=False)
+
+    @cached_property
     def name(self) -> str:
         return self._layers.self.name.lower()
 
@@ -978,78 +1232,86 @@ class DTProjectV4(DTProject):
         return recipe
 
     @staticmethod
-    def _load_layers(path: str) -> 'DTProject.Layers':
-        if not os.path.exists(path):
-            msg = f"The project path {path!r} does not exist."
-            raise DTProjectNotFound(msg)
+    def _load_layers(path: str, validate: bool = True) -> 'DTProject.Layers':
         layers_dir: str = os.path.join(path, "dtproject")
-        # if the directory 'dtproject' is missing
-        if not os.path.exists(layers_dir):
-            msg = f"The path '{path}' does not appear to be a Duckietown project."
-            raise DTProjectNotFound(msg)
-        # if 'dtproject' is not a directory
-        if not os.path.isdir(layers_dir):
-            msg = f"The path '{layers_dir}' must be a directory."
-            raise MalformedDTProject(msg)
+        if validate:
+            if not os.path.exists(path):
+                msg = f"The project path {path!r} does not exist."
+                raise DTProjectNotFound(msg)
+            # if the directory 'dtproject' is missing
+            if not os.path.exists(layers_dir):
+                msg = f"The path '{path}' does not appear to be a Duckietown project."
+                raise DTProjectNotFound(msg)
+            # if 'dtproject' is not a directory
+            if not os.path.isdir(layers_dir):
+                msg = f"The path '{layers_dir}' must be a directory."
+                raise MalformedDTProject(msg)
 
-        layers: Dict[str, Union[Layer, dict]] = {}
+        # list the layers directory once, entries come with their file type and (cached) stats
+        with os.scandir(layers_dir) as it:
+            yaml_entries: Dict[str, os.DirEntry] = {
+                sys.intern(entry.name[:-len(".yaml")]): entry for entry in it if entry.name.endswith(".yaml")
+            }
+        layer_entries: Dict[str, os.DirEntry] = {}
 
-        # load required layers
-        for layer_name, layer_class in DTProject.REQUIRED_LAYERS.items():
+        # find required layers
+        for layer_name in DTProject.REQUIRED_LAYERS:
             # make sure the <layer>.yaml file is there
-            layer_fpath: str = os.path.join(layers_dir, f"{layer_name}.yaml")
-            if not os.path.exists(layer_fpath) or not os.path.isfile(layer_fpath):
+            entry: Optional[os.DirEntry] = yaml_entries.get(layer_name, None)
+            if entry is None or not entry.is_file():
+                layer_fpath: str = os.path.join(layers_dir, f"{layer_name}.yaml")
                 msg = f"The file '{layer_fpath}' is missing."
                 raise MalformedDTProject(msg)
-            layers[layer_name] = layer_class.from_yaml_file(layer_fpath)
+            layer_entries[layer_name] = entry
 
-        # load optional (but known) layers
-        for layer_name, layer_class in DTProject.OPTIONAL_LAYERS.items():
-            # load the <layer>.yaml file if it is there
-            layer_fpath: str = os.path.join(layers_dir, f"{layer_name}.yaml")
-            if not os.path.exists(layer_fpath):
+        # find optional (but known) layers
+        for layer_name in DTProject.OPTIONAL_LAYERS:
+            # use the <layer>.yaml file if it is there
+            entry: Optional[os.DirEntry] = yaml_entries.get(layer_name, None)
+            if entry is None:
                 continue
-            if not os.path.isfile(layer_fpath):
-                msg = f"The path '{layer_fpath}' must be a regular file."
+            if not entry.is_file():
+                # dangling symlinks are treated as missing files
+                if not os.path.exists(entry.path):
+                    continue
+                msg = f"The path '{entry.path}' must be a regular file."
                 raise MalformedDTProject(msg)
-            layers[layer_name] = layer_class.from_yaml_file(layer_fpath)
+            layer_entries[layer_name] = entry
+
+        # find custom layers
+        for layer_name, entry in yaml_entries.items():
+            # like a '*.yaml' glob, hidden files are not considered
+            if entry.name.startswith(".") or layer_name in DTProject.KNOWN_LAYERS or not entry.is_file():
+                continue
+            layer_entries[layer_name] = entry
+
+        # parse all layers, any change to (the stats of) any of the files invalidates the cached content
+        layer_stats: List[LayerFileStat] = []
+        for layer_name, entry in layer_entries.items():
+            st: os.stat_result = entry.stat()
+            layer_stats.append((layer_name, entry.path, st.st_mtime_ns, st.st_size))
+        # the cached content is shared, make sure the layers we build do not alias it
+        layers_content: Dict[str, Any] = copy.deepcopy(_load_layers_content_cached(tuple(layer_stats)))
 
-        # load custom layers
+        layers: Dict[str, Union[Layer, dict]] = {}
         custom_layers: Set[str] = set()
-        layer_pattern = os.path.join(path, "dtproject", "*.yaml")
-        for layer_fpath in glob.glob(layer_pattern):
-            layer_name: str = Path(layer_fpath).stem
-            if layer_name not in DTProject.KNOWN_LAYERS:
-                with open(layer_fpath, "rt") as fin:
-                    layer_content: dict = yaml.safe_load(fin) or {}
-                    layers[layer_name] = layer_content
-                    custom_layers.add(layer_name)
+        for layer_name, layer_content in layers_content.items():
+            layer_class = DTProject.KNOWN_LAYERS.get(layer_name, None)
+            if layer_class is None:
+                layers[layer_name] = layer_content or {}
+                custom_layers.add(layer_name)
+            else:
+                layers[layer_name] = layer_class.from_dict(layer_content)
 
         # extend layers class
-        Layers = dataclasses.make_dataclass(
-            'ExtendedLayers',
-            fields=[
-                (layer, dict, cast(dataclasses.Field, dataclasses.field(default_factory=dict)))
-                for layer in custom_layers
-            ],
-            bases=(DTProject.Layers,)
-        )
+        Layers = _make_layers_cls(frozenset(custom_layers))
         # ---
         return Layers(**layers)
 
     @classmethod
     def is_instance_of(cls, path: str) -> bool:
-        if not os.path.exists(path):
-            return False
-        layers_dir: str = os.path.join(path, "dtproject")
-        # if the directory 'dtproject' is missing
-        if not os.path.exists(layers_dir):
-            return False
-        # if 'dtproject' is not a directory
-        if not os.path.isdir(layers_dir):
-            return False
-        # ---
-        return True
+        # a single stat tells us whether 'dtproject' exists and is a directory
+        return os.path.isdir(os.path.join(path, "dtproject"))
 
 
 class DTProjectV1to3(DTProject):
@@ -1064,14 +1326,13 @@ class DTProjectV1to3(DTProject):
         self._type = self._project_info["TYPE"]
         self._type_version = self._project_info["TYPE_VERSION"]
         self._version = self._project_info["VERSION"]
-        self._adapters.append("dtproject")
 
     @property
     @abstractmethod
     def format(self) -> LayerFormat:
         pass
 
-    @property
+    @cached_property
     def name(self) -> str:
         return self._project_info.get(
             # a name defined in the dtproject descriptor takes precedence
@@ -1127,13 +1388,13 @@ class DTProjectV1to3(DTProject):
     def type_version(self) -> str:
         return self._type_version
 
-    @property
+    @cached_property
     def distro(self) -> str:
         return self._repository.branch.split("-")[0] if self._repository else "latest"
 
     @property
     def metadata(self) -> Dict[str, str]:
-        return copy.deepcopy(self._project_info)
+        return self._project_info.copy()
 
     @property
     def layers(self) -> 'DTProject.Layers':
@@ -1160,58 +1421,73 @@ class DTProjectV1to3(DTProject):
 
     @staticmethod
     def _get_project_info(path: str):
-        if not os.path.exists(path):
-            msg = f"The project path {path!r} does not exist."
-            raise OSError(msg)
-
         metafile = os.path.join(path, ".dtproject")
-        # if the file '.dtproject' is missing
-        if not os.path.exists(metafile):
+        # a single stat tells us whether the file exists and gives us the cache key
+        try:
+            st = os.stat(metafile)
+        except (FileNotFoundError, NotADirectoryError):
+            # only look at the project path if the file '.dtproject' is missing
+            if not os.path.exists(path):
+                msg = f"The project path {path!r} does not exist."
+                raise OSError(msg)
             msg = f"The path '{path}' does not appear to be a Duckietown project."
             raise DTProjectNotFound(msg)
-        # load '.dtproject'
-        with open(metafile, "rt") as metastream:
-            lines: List[str] = metastream.readlines()
+        return DTProjectV1to3._parse_project_info(path, metafile, st.st_mtime_ns, st.st_size).copy()
+
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _parse_project_info(path: str, metafile: str, mtime_ns: int, size: int) -> Dict[str, str]:
+        # NOTE: the file stats are (mostly) only part of the cache key, they make sure we re-parse modified files
         # empty metadata?
-        if not lines:
+        if size == 0:
             msg = f"The metadata file '{metafile}' is empty."
             raise MalformedDTProject(msg)
-        # strip lines
-        lines = [line.strip() for line in lines]
-        # remove empty lines and comments
-        lines = [line for line in lines if len(line) > 0 and not line.startswith("#")]
-        # parse metadata
-        metadata = {key.strip().upper(): val.strip() for key, val in [line.split("=") for line in lines]}
-        # look for version-agnostic keys
-        for key in REQUIRED_METADATA_KEYS["*"]:
-            if key not in metadata:
-                msg = f"The metadata file '{metafile}' does not contain the key '{key}'."
+        # load '.dtproject'
+        metadata: Dict[str, str] = {}
+        with open(metafile, "rb") as metastream:
+            data: bytes = metastream.read()
+        # parse metadata, blank lines never match
+        for match in _DTPROJECT_LINE.finditer(data):
+            malformed: Optional[bytes] = match.group("malformed")
+            if malformed is not None:
+                msg = f"The metadata file '{metafile}' contains a malformed line: '{malformed.decode()}'."
                 raise MalformedDTProject(msg)
-        # validate version
-        version = metadata["TYPE_VERSION"]
-        if version == "*" or version not in REQUIRED_METADATA_KEYS:
+            key: Optional[bytes] = match.group("key")
+            # skip comments
+            if key is None:
+                continue
+            # keys come from a small vocabulary, interning them dedups them across projects
+            metadata[sys.intern(key.decode().upper())] = match.group("value").decode()
+        # validate version first, it is the cheapest way to reject a project
+        version: Optional[str] = metadata.get("TYPE_VERSION", None)
+        if version is None:
+            msg = f"The metadata file '{metafile}' does not contain the key 'TYPE_VERSION'."
+            raise MalformedDTProject(msg)
+        if version not in REQUIRED_METADATA_KEYS_BY_VERSION:
             msg = "The project version %s is not supported." % version
             raise UnsupportedDTProjectVersion(msg)
-        # validate metadata
-        for key in REQUIRED_METADATA_KEYS[version]:
-            if key not in metadata:
-                msg = f"The metadata file '{metafile}' does not contain the key '{key}'."
-                raise MalformedDTProject(msg)
-        # validate metadata keys specific to project type and version
-        type = metadata["TYPE"]
-        for key in REQUIRED_METADATA_PER_TYPE_KEYS.get(type, {}).get(version, []):
-            if key not in metadata:
-                msg = f"The metadata file '{metafile}' does not contain the key '{key}'."
-                raise MalformedDTProject(msg)
+        # validate metadata (including keys specific to project type and version)
+        required: FrozenSet[str] = REQUIRED_METADATA_KEYS_BY_VERSION_TYPE.get(
+            (version, metadata.get("TYPE")), REQUIRED_METADATA_KEYS_BY_VERSION[version]
+        )
+        missing: FrozenSet[str] = required.difference(metadata)
+        if missing:
+            keys: str = ", ".join(f"'{key}'" for key in sorted(missing))
+            msg = f"The metadata file '{metafile}' does not contain the key(s) {keys}."
+            raise MalformedDTProject(msg)
         # metadata is valid
         metadata["PATH"] = path
         return metadata
 
     @classmethod
     def is_instance_of(cls, path: str) -> bool:
+        # fast reject, no need to parse anything if there is no '.dtproject' file
+        if not os.path.isfile(os.path.join(path, ".dtproject")):
+            return False
         try:
-            cls._get_project_info(path)
-        except Exception:
+            DTProjectV1to3._get_project_info(path)
+        # unreadable, undecodable (ValueError) or invalid metadata files are not v1-3 projects
+        except (OSError, ValueError, DTProjectError):
             return False
         return True
 
@@ -1225,9 +1501,7 @@ class DTProjectV1(DTProjectV1to3):
 
     @classmethod
     def is_instance_of(cls, path: str) -> bool:
-        try:
-            DTProjectV1to3._get_project_info(path)
-        except Exception:
+        if not DTProjectV1to3.is_instance_of(path):
             return False
         return os.path.isfile(os.path.join(path, "launch.sh")) and os.path.isdir(os.path.join(path, "code"))
 
@@ -1241,12 +1515,9 @@ class DTProjectV2(DTProjectV1to3):
 
     @classmethod
     def is_instance_of(cls, path: str) -> bool:
-        try:
-            DTProjectV1to3._get_project_info(path)
-        except Exception:
+        if not DTProjectV1to3.is_instance_of(path):
             return False
-        return os.path.isfile(os.path.join(path, ".dtproject")) and \
-               not os.path.isfile(os.path.join(path, "dependencies-py3.dt.txt"))
+        return not os.path.isfile(os.path.join(path, "dependencies-py3.dt.txt"))
 
 
 # noinspection PyAbstractClass
@@ -1258,9 +1529,6 @@ class DTProjectV3(DTProjectV1to3):
 
     @classmethod
     def is_instance_of(cls, path: str) -> bool:
-        try:
-            DTProjectV1to3._get_project_info(path)
-        except Exception:
+        if not DTProjectV1to3.is_instance_of(path):
             return False
-        return os.path.isfile(os.path.join(path, ".dtproject")) and \
-               os.path.isfile(os.path.join(path, "dependencies-py3.dt.txt"))
+        return os.path.isfile(os.path.join(path, "dependencies-py3.dt.txt"))
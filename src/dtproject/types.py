@@ -1,17 +1,37 @@
 import dataclasses
-from typing import Optional, TypeVar, Generic
-
-import yaml
-from dataclass_wizard import YAMLWizard
+import sys
+from typing import Optional, TypeVar, Generic, Any
 
 from .constants import *
+from .exceptions import MalformedDTProject
+from .utils.misc import load_yaml_file
 
 
 T = TypeVar("T")
 
+# dataclasses support __slots__ from Python 3.10
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def _required(cls: type, d: dict, key: str) -> Any:
+    if key not in d:
+        raise MalformedDTProject(f"The key '{key}' is required by '{cls.__name__}'.")
+    return d[key]
+
+
+def _str(value: Any) -> Optional[str]:
+    # YAML might give us numbers (e.g., `version: 4`) where we expect strings
+    return None if value is None else str(value)
+
+
+def _bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "yes", "y", "on", "1")
+    return bool(value)
+
 
 class Layer:
-    pass
+    __slots__ = ()
 
 
 class DictLayer(Layer, Generic[T], dict):
@@ -37,44 +57,66 @@ class DictLayer(Layer, Generic[T], dict):
         return recipe in self
 
     @classmethod
-    def from_yaml_file(cls, path: str) -> 'DictLayer':
-        with open(path, "rt") as fin:
-            d: Dict[str, dict] = yaml.safe_load(fin)
+    def from_dict(cls, d: Dict[str, dict]) -> 'DictLayer':
         return cls(given=True, **{n: cls.ITEM_CLASS(**r) for n, r in d.items()})
 
+    @classmethod
+    def from_yaml_file(cls, path: str) -> 'DictLayer':
+        return cls.from_dict(load_yaml_file(path))
+
     @classmethod
     def empty(cls) -> 'DictLayer':
         return cls(given=False)
 
 
-@dataclasses.dataclass
-class DataClassLayer(YAMLWizard, Layer):
-    pass
+@dataclasses.dataclass(**DATACLASS_SLOTS)
+class DataClassLayer(Layer):
 
+    @classmethod
+    def from_yaml_file(cls, path: str) -> 'DataClassLayer':
+        # every concrete layer defines its own `from_dict`
+        return cls.from_dict(load_yaml_file(path))
 
-@dataclasses.dataclass
+
+@dataclasses.dataclass(**DATACLASS_SLOTS)
 class LayerFormat(DataClassLayer):
     version: int
 
+    @classmethod
+    def from_dict(cls, d: dict) -> 'LayerFormat':
+        return cls(version=int(_required(cls, d, "version")))
+
 
-@dataclasses.dataclass
+@dataclasses.dataclass(**DATACLASS_SLOTS)
 class LayerOptions(DataClassLayer):
     needs_recipe: bool = False
 
+    @classmethod
+    def from_dict(cls, d: dict) -> 'LayerOptions':
+        return cls(needs_recipe=_bool(d.get("needs_recipe", False)))
 
-@dataclasses.dataclass
+
+@dataclasses.dataclass(**DATACLASS_SLOTS)
 class Maintainer:
     name: str
     email: str
     organization: Optional[str] = None
 
+    @classmethod
+    def from_dict(cls, d: dict) -> 'Maintainer':
+        return cls(
+            name=_str(_required(cls, d, "name")),
+            email=_str(_required(cls, d, "email")),
+            organization=_str(d.get("organization", None)),
+        )
+
     def __str__(self):
         if self.organization:
             return f"{self.name} @ {self.organization} ({self.email})"
         return f"{self.name} ({self.email})"
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(**DATACLASS_SLOTS)
 class LayerSelf(DataClassLayer):
     name: str
     maintainer: Maintainer
@@ -82,26 +124,57 @@ class LayerSelf(DataClassLayer):
     version: str
     icon: str = DEFAULT_PROJECT_ICON
 
+    @classmethod
+    def from_dict(cls, d: dict) -> 'LayerSelf':
+        return cls(
+            name=_str(_required(cls, d, "name")),
+            maintainer=Maintainer.from_dict(_required(cls, d, "maintainer")),
+            description=_str(_required(cls, d, "description")),
+            version=_str(_required(cls, d, "version")),
+            icon=_str(d.get("icon", DEFAULT_PROJECT_ICON)),
+        )
 
-@dataclasses.dataclass
+
+@dataclasses.dataclass(**DATACLASS_SLOTS)
 class LayerTemplate(DataClassLayer):
     name: Optional[str]
     version: str
     provider: str = DEFAULT_GIT_PROVIDER
 
+    @classmethod
+    def from_dict(cls, d: dict) -> 'LayerTemplate':
+        return cls(
+            name=_str(_required(cls, d, "name")),
+            version=_str(_required(cls, d, "version")),
+            provider=_str(d.get("provider", DEFAULT_GIT_PROVIDER)),
+        )
 
-@dataclasses.dataclass
+
+@dataclasses.dataclass(**DATACLASS_SLOTS)
 class LayerDistro(DataClassLayer):
     name: str
 
+    @classmethod
+    def from_dict(cls, d: dict) -> 'LayerDistro':
+        return cls(name=_str(_required(cls, d, "name")))
 
-@dataclasses.dataclass
+
+@dataclasses.dataclass(**DATACLASS_SLOTS)
 class LayerBase(DataClassLayer):
     repository: str
     registry: Optional[str] = None
     organization: str = DUCKIETOWN
     tag: Optional[str] = None
 
+    @classmethod
+    def from_dict(cls, d: dict) -> 'LayerBase':
+        return cls(
+            repository=_str(_required(cls, d, "repository")),
+            registry=_str(d.get("registry", None)),
+            organization=_str(d.get("organization", DUCKIETOWN)),
+            tag=_str(d.get("tag", None)),
+        )
+
 
 @dataclasses.dataclass
 class Recipe:
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import pickle
+import time
+from typing import Any, Callable, Tuple
+
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "dtproject")
+# entries are keyed by file stats, edited files leave their old entries behind, those are pruned by age
+CACHE_MAX_AGE_SECS = 30 * 24 * 60 * 60
+
+CacheKey = Tuple[Any, ...]
+
+# the cache directory is pruned (at most) once per process
+_pruned: bool = False
+
+
+def get_cache_dir() -> str:
+    return os.environ.get("DTPROJECT_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+
+def is_cache_enabled() -> bool:
+    return os.environ.get("DTPROJECT_CACHE_DISABLE", "0").lower() not in ("1", "true", "yes")
+
+
+def prune(max_age_secs: int = CACHE_MAX_AGE_SECS):
+    """
+    Removes the entries that were written more than `max_age_secs` seconds ago.
+    """
+    cache_dir: str = get_cache_dir()
+    if not os.path.isdir(cache_dir):
+        return
+    oldest: float = time.time() - max_age_secs
+    with os.scandir(cache_dir) as shards:
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            with os.scandir(shard.path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.stat().st_mtime < oldest:
+                            os.remove(entry.path)
+                    except OSError:
+                        pass
+
+
+def _entry_fpath(key: CacheKey) -> str:
+    digest: str = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+    return os.path.join(get_cache_dir(), digest[:2], f"{digest}.pickle")
+
+
+def cached(key: CacheKey, compute: Callable[[], Any]) -> Any:
+    """
+    Returns the value stored on disk for the given key, or computes (and stores) it on a miss.
+    The cache is best-effort, any failure in reading or writing it falls back to `compute`.
+    """
+    global _pruned
+    if not is_cache_enabled():
+        return compute()
+    fpath: str = _entry_fpath(key)
+    # cache hit
+    try:
+        with open(fpath, "rb") as fin:
+            return pickle.load(fin)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        pass
+    # cache miss
+    value: Any = compute()
+    try:
+        # misses are the only time entries are added, a good time to drop stale ones
+        if not _pruned:
+            _pruned = True
+            prune()
+        os.makedirs(os.path.dirname(fpath), exist_ok=True)
+        # write to a temporary file first so that concurrent readers never see partial entries
+        tmp_fpath: str = f"{fpath}.{os.getpid()}.tmp"
+        with open(tmp_fpath, "wb") as fout:
+            pickle.dump(value, fout, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_fpath, fpath)
+    except OSError:
+        pass
+    # ---
+    return value
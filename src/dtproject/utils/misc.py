@@ -1,16 +1,61 @@
 import os
 import re
 import subprocess
-from typing import List
+from typing import List, Any, Tuple
 
+import yaml
+
+from .. import logger
 from ..constants import DOCKER_LABEL_DOMAIN, CANONICAL_ARCH
 
+try:
+    from functools import cached_property
+except ImportError:
+    # Python < 3.8
+    class cached_property:
+
+        def __init__(self, func):
+            self.func = func
+            self.__doc__ = func.__doc__
+
+        def __get__(self, instance, owner=None):
+            if instance is None:
+                return self
+            value = instance.__dict__[self.func.__name__] = self.func(instance)
+            return value
+
+
+_UNSAFE_NAME_CHARS = re.compile(r"[^\w\-.]")
+
+# use the libyaml (C) loader when available, it is an order of magnitude faster than the pure-python one
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+    logger.warning("PyYAML was built without libyaml, YAML files will be parsed by the (slower) "
+                   "pure-python loader.")
+
 
 def run_cmd(cmd):
     cmd = " ".join(cmd)
     return [line for line in subprocess.check_output(cmd, shell=True).decode("utf-8").split("\n") if line]
 
 
+def run_cmds(cmds: List[List[str]]) -> List[Tuple[int, List[str]]]:
+    """
+    Runs a sequence of commands in a single shell (i.e., a single fork) and returns the exit code
+    and the (non-empty) output lines of each one of them.
+    """
+    # each command's output is followed by its exit code, both NUL-terminated
+    script = "; ".join(f"{' '.join(cmd)}; printf '\\0%d\\0' $?" for cmd in cmds)
+    out: List[str] = subprocess.run(script, shell=True, stdout=subprocess.PIPE).stdout.decode("utf-8").split("\0")
+    return [
+        (int(out[2 * i + 1]), [line for line in out[2 * i].split("\n") if line])
+        for i in range(len(cmds))
+    ]
+
+
 def dtlabel(key, value=None):
     label = f"{DOCKER_LABEL_DOMAIN}.{key.lstrip('.')}"
     if value is not None:
@@ -68,5 +113,10 @@ def load_dependencies_file(fpath: str, comments: bool = False) -> List[str]:
     return deps
 
 
+def load_yaml_file(fpath: str) -> Any:
+    with open(fpath, "rb") as fin:
+        return yaml.load(fin, Loader=SafeLoader)
+
+
 def safe_name(s: str) -> str:
-    return re.sub(r"[^\w\-.]", "-", s)
+    return _UNSAFE_NAME_CHARS.sub("-", s)
@@ -1,7 +1,9 @@
+import atexit
 import dataclasses
 import os.path
 import shutil
 import subprocess
+import tempfile
 from contextlib import ContextDecorator
 from typing import Optional, Dict, Union, Any
 from unittest import skipIf
@@ -12,6 +14,11 @@ from dtproject.types import LayerBase, Layer, DataClassLayer, DictLayer, LayerOp
 
 ASSETS_DIR: str = os.path.abspath(os.path.join(os.path.dirname(__file__), "assets"))
 
+# never write to the user's (or CI's) real cache
+CACHE_DIR: str = tempfile.mkdtemp(prefix="dtproject-tests-cache-")
+os.environ["DTPROJECT_CACHE_DIR"] = CACHE_DIR
+atexit.register(shutil.rmtree, CACHE_DIR, ignore_errors=True)
+
 
 def get_project_path(name: str) -> str:
     d = os.path.abspath(os.path.join(ASSETS_DIR, "projects", name))
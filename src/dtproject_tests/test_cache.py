@@ -0,0 +1,67 @@
+import os
+import tempfile
+import time
+
+from dtproject.utils.cache import cached, prune, CACHE_MAX_AGE_SECS, _entry_fpath
+
+import unittest
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._old_cache_dir = os.environ.get("DTPROJECT_CACHE_DIR", None)
+        os.environ["DTPROJECT_CACHE_DIR"] = self._tmpdir.name
+
+    def tearDown(self):
+        if self._old_cache_dir is None:
+            del os.environ["DTPROJECT_CACHE_DIR"]
+        else:
+            os.environ["DTPROJECT_CACHE_DIR"] = self._old_cache_dir
+        self._tmpdir.cleanup()
+
+    def test_cache_hit(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"key": "value"}
+
+        self.assertEqual(cached(("test", 1), compute), {"key": "value"})
+        self.assertEqual(cached(("test", 1), compute), {"key": "value"})
+        self.assertEqual(len(calls), 1)
+
+    def test_cache_miss_on_new_key(self):
+        self.assertEqual(cached(("test", 1), lambda: 1), 1)
+        self.assertEqual(cached(("test", 2), lambda: 2), 2)
+
+    def test_cache_disabled(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return 1
+
+        os.environ["DTPROJECT_CACHE_DISABLE"] = "1"
+        try:
+            cached(("test", 1), compute)
+            cached(("test", 1), compute)
+        finally:
+            del os.environ["DTPROJECT_CACHE_DISABLE"]
+        # ---
+        self.assertEqual(len(calls), 2)
+        self.assertFalse(os.path.exists(_entry_fpath(("test", 1))))
+
+    def test_prune_old_entries(self):
+        cached(("test", "old"), lambda: 1)
+        cached(("test", "new"), lambda: 2)
+        old_fpath: str = _entry_fpath(("test", "old"))
+        new_fpath: str = _entry_fpath(("test", "new"))
+        # make one of the entries older than the maximum age
+        stale: float = time.time() - CACHE_MAX_AGE_SECS - 60
+        os.utime(old_fpath, (stale, stale))
+        prune()
+        # ---
+        self.assertFalse(os.path.exists(old_fpath))
+        self.assertTrue(os.path.exists(new_fpath))
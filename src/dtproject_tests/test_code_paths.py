@@ -0,0 +1,77 @@
+import os
+import tempfile
+
+from dtproject import DTProject
+import unittest
+
+
+DTPROJECT_FILE = """
+VERSION=0.0.0
+TYPE=template-exercise
+TYPE_VERSION=3
+NAME=my-exercise
+RECIPE_REPOSITORY=my-recipes
+RECIPE_BRANCH=my_branch
+RECIPE_LOCATION=my_location
+"""
+
+
+class TestCodePaths(unittest.TestCase):
+    """
+    Exercise projects (v3) mount every directory matching 'packages/*' and 'assets/*'.
+    """
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._pd: str = os.path.join(self._tmpdir.name, "project")
+        os.makedirs(self._pd)
+        with open(os.path.join(self._pd, ".dtproject"), "wt") as fout:
+            fout.write(DTPROJECT_FILE)
+        with open(os.path.join(self._pd, "dependencies-py3.dt.txt"), "wt") as fout:
+            fout.write("")
+        # a directory outside of the project to link to
+        self._outside: str = os.path.join(self._tmpdir.name, "outside")
+        os.makedirs(self._outside)
+        for parent in ["packages", "assets"]:
+            parent_dir: str = os.path.join(self._pd, parent)
+            # regular directory
+            os.makedirs(os.path.join(parent_dir, "regular"))
+            # hidden directory, not matched by the pattern
+            os.makedirs(os.path.join(parent_dir, ".hidden"))
+            # dotted directory name, the destination takes its stem
+            os.makedirs(os.path.join(parent_dir, "my.dotted"))
+            # plain file, only directories are mounted
+            with open(os.path.join(parent_dir, "file.txt"), "wt") as fout:
+                fout.write("")
+            # symlink to a directory, it is mounted like a directory
+            os.symlink(self._outside, os.path.join(parent_dir, "linked"))
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _assert_paths(self, paths, parent: str, root: str):
+        destination: str = f"/code/catkin_ws/src/my-exercise/{parent}"
+        locals_, destinations = paths
+        self.assertEqual(
+            sorted(zip(locals_, destinations)),
+            [
+                (os.path.join(root, parent, "linked"), os.path.join(destination, "linked")),
+                (os.path.join(root, parent, "my.dotted"), os.path.join(destination, "my")),
+                (os.path.join(root, parent, "regular"), os.path.join(destination, "regular")),
+            ]
+        )
+
+    def test_code_paths(self):
+        p = DTProject(self._pd)
+        # ---
+        self._assert_paths(p.code_paths(), "packages", self._pd)
+
+    def test_code_paths_custom_root(self):
+        p = DTProject(self._pd)
+        # ---
+        self._assert_paths(p.code_paths(root="/remote/project"), "packages", "/remote/project")
+
+    def test_assets_paths(self):
+        p = DTProject(self._pd)
+        # ---
+        self._assert_paths(p.assets_paths(), "assets", self._pd)
@@ -0,0 +1,45 @@
+import os
+import shutil
+import tempfile
+
+from . import get_project_path
+
+from dtproject import DTProject
+import unittest
+
+
+CONFIGURATIONS_YAML = """
+version: '1.0'
+
+configurations:
+  my-config:
+    environment:
+      KEY: value
+"""
+
+
+class TestConfigurations(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._pd: str = os.path.join(self._tmpdir.name, "project")
+        shutil.copytree(get_project_path("basic_v2"), self._pd)
+        with open(os.path.join(self._pd, "configurations.yaml"), "wt") as fout:
+            fout.write(CONFIGURATIONS_YAML)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_configuration(self):
+        p = DTProject(self._pd)
+        # ---
+        self.assertEqual(p.configuration("my-config"), {"environment": {"KEY": "value"}})
+        with self.assertRaises(KeyError):
+            p.configuration("not-a-config")
+
+    def test_edited_configuration_does_not_leak(self):
+        p = DTProject(self._pd)
+        p.configuration("my-config")["environment"]["KEY"] = "edited"
+        p.configurations()["my-config"]["environment"]["OTHER"] = "added"
+        # ---
+        self.assertEqual(p.configuration("my-config"), {"environment": {"KEY": "value"}})
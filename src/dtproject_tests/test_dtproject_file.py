@@ -0,0 +1,71 @@
+import os
+import tempfile
+
+from dtproject.dtproject import DTProjectV1to3
+from dtproject.exceptions import MalformedDTProject, UnsupportedDTProjectVersion
+import unittest
+
+
+class TestDTProjectFile(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _parse(self, content: str) -> dict:
+        with open(os.path.join(self._tmpdir.name, ".dtproject"), "wt") as fout:
+            fout.write(content)
+        return DTProjectV1to3._get_project_info(self._tmpdir.name)
+
+    def test_comments_and_whitespace(self):
+        metadata = self._parse(
+            "# a comment\n"
+            "\n"
+            "  version = 1.0.0  \n"
+            "TYPE=template-basic\n"
+            "TYPE_VERSION=3\n"
+        )
+        # ---
+        self.assertEqual(
+            metadata,
+            {
+                "VERSION": "1.0.0",
+                "TYPE": "template-basic",
+                "TYPE_VERSION": "3",
+                "PATH": self._tmpdir.name,
+            },
+        )
+
+    def test_value_with_equal_sign(self):
+        metadata = self._parse("VERSION=0.0.0\nTYPE=template-basic\nTYPE_VERSION=3\nEXTRA=a=b\n")
+        # ---
+        self.assertEqual(metadata["EXTRA"], "a=b")
+
+    def test_malformed_line(self):
+        with self.assertRaises(MalformedDTProject):
+            self._parse("VERSION=0.0.0\nTYPE=template-basic\nTYPE_VERSION=3\nnot a key-value pair\n")
+
+    def test_empty_file(self):
+        with self.assertRaises(MalformedDTProject):
+            self._parse("")
+
+    def test_missing_key(self):
+        with self.assertRaises(MalformedDTProject):
+            self._parse("VERSION=0.0.0\nTYPE_VERSION=3\n")
+
+    def test_missing_keys_are_all_reported(self):
+        with self.assertRaises(MalformedDTProject) as ctx:
+            self._parse("TYPE=template-exercise\nTYPE_VERSION=3\n")
+        # ---
+        for key in ["VERSION", "NAME", "RECIPE_REPOSITORY", "RECIPE_BRANCH", "RECIPE_LOCATION"]:
+            self.assertIn(f"'{key}'", str(ctx.exception))
+
+    def test_unsupported_version(self):
+        with self.assertRaises(UnsupportedDTProjectVersion):
+            self._parse("TYPE=template-basic\nTYPE_VERSION=4\n")
+
+    def test_missing_version(self):
+        with self.assertRaises(MalformedDTProject):
+            self._parse("VERSION=0.0.0\nTYPE=template-basic\n")
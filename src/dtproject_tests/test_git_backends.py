@@ -0,0 +1,85 @@
+import os
+import subprocess
+import tempfile
+from unittest import skipIf
+
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+from dtproject.dtproject import DTProject
+import unittest
+
+
+class TestGitBackends(unittest.TestCase):
+    """
+    The in-process (pygit2) and the CLI readers must report the same repository info.
+    """
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._path: str = self._tmpdir.name
+        self._git("init")
+        self._git("symbolic-ref", "HEAD", "refs/heads/master")
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _git(self, *args: str):
+        cmd = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args]
+        subprocess.check_output(cmd, cwd=self._path, stderr=subprocess.PIPE)
+
+    def _write(self, fname: str, content: str):
+        with open(os.path.join(self._path, fname), "wt") as fout:
+            fout.write(content)
+
+    def _assert_same_info(self):
+        self.assertEqual(DTProject._read_repo_pygit2(self._path), DTProject._read_repo_cli(self._path))
+
+    @skipIf(pygit2 is None, "pygit2 is not installed")
+    def test_backends_parity(self):
+        with self.subTest("unborn"):
+            self._assert_same_info()
+        with self.subTest("untracked"):
+            self._write("untracked.txt", "untracked")
+            self._assert_same_info()
+        with self.subTest("untracked dir"):
+            os.makedirs(os.path.join(self._path, "newdir"))
+            self._write(os.path.join("newdir", "a.txt"), "a")
+            self._write(os.path.join("newdir", "b.txt"), "b")
+            self._assert_same_info()
+        with self.subTest("staged"):
+            self._write("file.txt", "v1")
+            self._git("add", "file.txt")
+            self._assert_same_info()
+        with self.subTest("committed"):
+            self._git("commit", "-m", "first")
+            self._assert_same_info()
+        with self.subTest("modified"):
+            self._write("file.txt", "v2")
+            self._assert_same_info()
+        with self.subTest("ignored"):
+            self._write(".gitignore", "*.pyc\nbuild/\n")
+            self._write("module.pyc", "")
+            os.makedirs(os.path.join(self._path, "build"))
+            self._write(os.path.join("build", "output.bin"), "")
+            self._git("add", ".gitignore")
+            self._git("commit", "-m", "ignore")
+            self._assert_same_info()
+        with self.subTest("tagged"):
+            self._git("tag", "v1.0.0")
+            self._assert_same_info()
+        with self.subTest("remote"):
+            self._git("remote", "add", "origin", "git@github.com:does_not_matter/repo")
+            self._assert_same_info()
+        with self.subTest("rename"):
+            self._write("to-rename.txt", "content\n" * 10)
+            self._git("add", "to-rename.txt")
+            self._git("commit", "-m", "to rename")
+            self._git("mv", "to-rename.txt", "renamed.txt")
+            self._assert_same_info()
+        with self.subTest("detached"):
+            self._git("commit", "--allow-empty", "-m", "second")
+            self._git("checkout", "--detach", "HEAD~1")
+            self._assert_same_info()
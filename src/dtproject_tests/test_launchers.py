@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from . import get_project_path, skip_if_code_mounted, options_layer, recipes_layer
+
+from dtproject import DTProject
+import unittest
+
+
+class TestLaunchers(unittest.TestCase):
+
+    def test_launchers_project_v1(self):
+        pd = get_project_path("basic_v1")
+        p = DTProject(pd)
+        # ---
+        with self.assertRaises(NotImplementedError):
+            _ = p.launchers
+
+    def test_launchers_project_v4(self):
+        pd = get_project_path("basic_v4")
+        p = DTProject(pd)
+        # ---
+        self.assertEqual(p.launchers, ["default"])
+
+    @skip_if_code_mounted
+    def test_launchers_project_with_recipe(self):
+        pname = "basic_v4"
+        pd = get_project_path(pname)
+        recipes = {
+            "default": {
+                "repository": "my-recipes",
+                "branch": "my_branch",
+            }
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # make a recipe with its own launcher
+            recipe_dir = os.path.join(tmpdir, "recipe")
+            shutil.copytree(get_project_path("basic_v3"), recipe_dir)
+            os.remove(os.path.join(recipe_dir, "launchers", "default.sh"))
+            with open(os.path.join(recipe_dir, "launchers", "from-recipe.sh"), "wt") as fout:
+                fout.write("#!/bin/bash\n")
+            with options_layer(pname, {"needs_recipe": True}):
+                with recipes_layer(pname, recipes):
+                    p = DTProject(pd)
+                    p.set_recipe_dir(recipe_dir)
+                    # ---
+                    # launchers from both the meat and the recipe are returned
+                    self.assertEqual(sorted(p.launchers), ["default", "from-recipe"])
+
+    @skip_if_code_mounted
+    def test_launchers_project_with_recipe_shared_launcher(self):
+        pname = "basic_v4"
+        pd = get_project_path(pname)
+        recipes = {
+            "default": {
+                "repository": "my-recipes",
+                "branch": "my_branch",
+            }
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # the recipe ships the same 'default' launcher as the meat
+            recipe_dir = os.path.join(tmpdir, "recipe")
+            shutil.copytree(get_project_path("basic_v3"), recipe_dir)
+            with options_layer(pname, {"needs_recipe": True}):
+                with recipes_layer(pname, recipes):
+                    p = DTProject(pd)
+                    p.set_recipe_dir(recipe_dir)
+                    # ---
+                    # launchers shipped by both are returned once
+                    self.assertEqual(p.launchers, ["default"])
+
+    @skip_if_code_mounted
+    def test_launchers_project_with_updated_recipe(self):
+        pname = "basic_v4"
+        pd = get_project_path(pname)
+        recipes = {
+            "default": {
+                "repository": "my-recipes",
+                "branch": "my_branch",
+            }
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            recipe_dir = os.path.join(tmpdir, "recipe")
+            shutil.copytree(get_project_path("basic_v3"), recipe_dir)
+            os.remove(os.path.join(recipe_dir, "launchers", "default.sh"))
+
+            def update_recipe(_):
+                # pulling the recipe brings in a new version and a new launcher
+                with open(os.path.join(recipe_dir, ".dtproject"), "wt") as fout:
+                    fout.write("VERSION=1.0.0\nTYPE=template-basic\nTYPE_VERSION=3\n")
+                with open(os.path.join(recipe_dir, "launchers", "from-update.sh"), "wt") as fout:
+                    fout.write("#!/bin/bash\n")
+                return True
+
+            with options_layer(pname, {"needs_recipe": True}):
+                with recipes_layer(pname, recipes):
+                    with mock.patch("dtproject.dtproject.get_recipe_project_dir", return_value=recipe_dir), \
+                            mock.patch("dtproject.dtproject.update_recipe", side_effect=update_recipe):
+                        p = DTProject(pd)
+                        self.assertEqual(p.launchers, ["default"])
+                        self.assertEqual(p.recipe.version, "0.0.0")
+                        self.assertTrue(p.update_cached_recipe())
+                        # ---
+                        # the recipe is reloaded after it is updated
+                        self.assertEqual(p.recipe.version, "1.0.0")
+                        self.assertEqual(sorted(p.launchers), ["default", "from-update"])